@@ -1,5 +1,8 @@
+import asyncio
+import contextlib
 import logging
 import os
+import sys
 
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
@@ -10,6 +13,7 @@ from a2a.types import (
     AgentCard,
     AgentSkill,
 )
+from _google_common import api_executor, refresh_forever
 from agent import create_agent
 from agent_executor import CalenderAgentExecutor
 from dotenv import load_dotenv
@@ -23,6 +27,69 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HOST = "localhost"
+PORT = 10003
+# Sessions and tasks live in per-process in-memory stores, so more than one
+# worker needs a sticky load balancer in front to keep conversations together.
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Static agent metadata is built once at import so forked workers share it.
+capabilities = AgentCapabilities(streaming=True)
+skills = [
+    AgentSkill(
+        id="calendar_list_events",
+        name="List Upcoming Events",
+        description="Shows upcoming calendar events within a specified time window.",
+        tags=["calendar", "events", "list"],
+        examples=["What meetings do I have this week?", "List the next three events on my calendar."],
+    ),
+    AgentSkill(
+        id="calendar_create_event",
+        name="Create Event",
+        description="Schedules a new calendar event with time, location, and optional attendees.",
+        tags=["calendar", "events", "create"],
+        examples=["Add a team sync tomorrow at 2 PM.", "Create a lunch meeting with Alex next Friday at noon."],
+    ),
+    AgentSkill(
+        id="calendar_search_events",
+        name="Search Events",
+        description="Finds calendar entries that match titles, descriptions, or attendee names.",
+        tags=["calendar", "events", "search"],
+        examples=["Find my appointments with the dentist.", "Look up events that mention quarterly review."],
+    ),
+    AgentSkill(
+        id="calendar_update_event",
+        name="Update Event",
+        description="Modifies details of an existing calendar event using its event ID.",
+        tags=["calendar", "events", "update"],
+        examples=["Move the project kickoff to 4 PM.", "Change the location of event ID 12345 to the main office."],
+    ),
+    AgentSkill(
+        id="calendar_delete_event",
+        name="Delete Event",
+        description="Removes an event from the calendar after confirmation.",
+        tags=["calendar", "events", "delete"],
+        examples=["Cancel event ID abc123.", "Delete my coffee chat with Jamie on Friday."],
+    ),
+    AgentSkill(
+        id="calendar_batch_events",
+        name="Batch Event Operations",
+        description="Runs several independent event lookups, creations, updates, or deletions in one request.",
+        tags=["calendar", "events", "batch"],
+        examples=["Delete events abc123 and def456.", "Create standups for Monday, Wednesday, and Friday at 9 AM."],
+    ),
+]
+agent_card = AgentCard(
+    name="Calendar Agent",
+    description="An agent that manages Google Calendar events",
+    url=f"http://{HOST}:{PORT}/",
+    version="1.0.0",
+    defaultInputModes=["text/plain"],
+    defaultOutputModes=["text/plain"],
+    capabilities=capabilities,
+    skills=skills,
+)
+
 
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
@@ -30,10 +97,42 @@ class MissingAPIKeyError(Exception):
     pass
 
 
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Runs the OAuth token refresher alongside the server."""
+    # asyncio.to_thread uses the loop's default executor
+    asyncio.get_running_loop().set_default_executor(api_executor())
+    refresher = asyncio.create_task(refresh_forever())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+
+
+def get_app():
+    """Builds the A2A app; uvicorn calls this once in every worker process."""
+    adk_agent = create_agent()
+    runner = Runner(
+        app_name=agent_card.name,
+        agent=adk_agent,
+        artifact_service=InMemoryArtifactService(),
+        session_service=InMemorySessionService(),
+        memory_service=InMemoryMemoryService(),
+    )
+    agent_executor = CalenderAgentExecutor(runner)
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=agent_executor,
+        task_store=InMemoryTaskStore(),
+    )
+    server = A2AStarletteApplication(
+        agent_card=agent_card, http_handler=request_handler
+    )
+    return server.build(lifespan=lifespan)
+
+
 def main():
     """Starts the agent server."""
-    host = "localhost"
-    port = 10003
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -42,74 +141,17 @@ def main():
                     "GOOGLE_API_KEY environment variable not set and GOOGLE_GENAI_USE_VERTEXAI is not TRUE."
                 )
 
-        capabilities = AgentCapabilities(streaming=True)
-        skills = [
-            AgentSkill(
-                id="calendar_list_events",
-                name="List Upcoming Events",
-                description="Shows upcoming calendar events within a specified time window.",
-                tags=["calendar", "events", "list"],
-                examples=["What meetings do I have this week?", "List the next three events on my calendar."],
-            ),
-            AgentSkill(
-                id="calendar_create_event",
-                name="Create Event",
-                description="Schedules a new calendar event with time, location, and optional attendees.",
-                tags=["calendar", "events", "create"],
-                examples=["Add a team sync tomorrow at 2 PM.", "Create a lunch meeting with Alex next Friday at noon."],
-            ),
-            AgentSkill(
-                id="calendar_search_events",
-                name="Search Events",
-                description="Finds calendar entries that match titles, descriptions, or attendee names.",
-                tags=["calendar", "events", "search"],
-                examples=["Find my appointments with the dentist.", "Look up events that mention quarterly review."],
-            ),
-            AgentSkill(
-                id="calendar_update_event",
-                name="Update Event",
-                description="Modifies details of an existing calendar event using its event ID.",
-                tags=["calendar", "events", "update"],
-                examples=["Move the project kickoff to 4 PM.", "Change the location of event ID 12345 to the main office."],
-            ),
-            AgentSkill(
-                id="calendar_delete_event",
-                name="Delete Event",
-                description="Removes an event from the calendar after confirmation.",
-                tags=["calendar", "events", "delete"],
-                examples=["Cancel event ID abc123.", "Delete my coffee chat with Jamie on Friday."],
-            ),
-        ]
-        agent_card = AgentCard(
-            name="Calendar Agent",
-            description="An agent that manages Google Calendar events",
-            url=f"http://{host}:{port}/",
-            version="1.0.0",
-            defaultInputModes=["text/plain"],
-            defaultOutputModes=["text/plain"],
-            capabilities=capabilities,
-            skills=skills,
-        )
-
-        adk_agent = create_agent()
-        runner = Runner(
-            app_name=agent_card.name,
-            agent=adk_agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
+        # The app is passed as an import string so each worker builds its own.
+        uvicorn.run(
+            "__main__:get_app",
+            factory=True,
+            host=HOST,
+            port=PORT,
+            workers=WORKERS,
+            # uvloop has no Windows build; stay on asyncio there.
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
         )
-        agent_executor = CalenderAgentExecutor(runner)
-
-        request_handler = DefaultRequestHandler(
-            agent_executor=agent_executor,
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-
-        uvicorn.run(server.build(), host=host, port=port)
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e}")
         exit(1)
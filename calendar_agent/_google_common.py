@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; the keyring path is used there
+    fcntl = None
+import httplib2
+import keyring
+import orjson
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.model import JsonModel
+
+logger = logging.getLogger(__name__)
+
+# Calendar API scope for full access
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+FIXED_PORT = 8080
+TOKEN_PATH = "token_calendar.json"
+
+# The token is kept in the OS keyring; TOKEN_PATH is the fallback when no
+# keyring backend is available (e.g. headless hosts) and for existing setups.
+KEYRING_SERVICE = "calendar_agent"
+KEYRING_USERNAME = "default"
+
+# The background refresher renews the token this long before it expires and
+# re-checks the cached credentials at least this often.
+REFRESH_MARGIN = timedelta(minutes=5)
+REFRESH_POLL_SECONDS = 60
+
+# Upper bound on a single Google API call so a hung connection can't stall a
+# worker forever. Token refreshes are bounded by google-auth's own timeout.
+HTTP_TIMEOUT = 10
+
+# Each tool thread keeps one keep-alive connection, so capping the threads
+# that run tool calls also bounds the outbound connection pool.
+MAX_CONNECTIONS = 32
+
+# Retries (with exponential backoff) for transient 429/5xx API responses on
+# idempotent calls
+NUM_RETRIES = 3
+
+# Process-lifetime cache shared by every calendar tool. The stored token is
+# only read once and the credentials are only rebuilt when they stop being valid.
+_CREDS = None
+_LOCK = threading.Lock()
+
+# Tools run their blocking API calls in worker threads and httplib2.Http is
+# not thread-safe, so each thread keeps its own client and keep-alive
+# transport, reused across every tool call that lands on that thread.
+_LOCAL = threading.local()
+
+
+def _load_credentials(creds):
+    """Loads, refreshes or re-authorizes credentials and persists the token."""
+    if creds is None:
+        stored = _read_token()
+        if stored:
+            try:
+                creds = Credentials.from_authorized_user_info(orjson.loads(stored), SCOPES)
+            except Exception as e:
+                logger.warning("Error loading stored token: %s. Will re-authenticate.", e)
+                creds = None
+    if not creds or not creds.valid:
+        # Only write the token back if it was refreshed or newly obtained
+        needs_save = False
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                needs_save = True
+            except Exception as e:
+                # Refresh failed, need full re-auth
+                logger.warning("Token refresh failed: %s", e)
+                creds = None
+
+        if not creds:  # Either no token or refresh failed
+            # The OAuth flow module is only loaded when consent is actually needed
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                "credentials.json", SCOPES
+            )
+            creds = flow.run_local_server(
+                port=FIXED_PORT,
+                access_type='offline',
+                prompt='consent'
+            )
+            needs_save = True
+
+        if needs_save:
+            _save_credentials(creds)
+    return creds
+
+
+def _lock_file(token, exclusive):
+    # Serializes token file access between worker processes (POSIX only)
+    if fcntl is not None:
+        fcntl.flock(token, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _read_token():
+    """Returns the stored authorized-user JSON from the keyring or token file."""
+    try:
+        stored = keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+        if stored:
+            return stored
+    except Exception as e:
+        logger.debug("Keyring unavailable, reading %s: %s", TOKEN_PATH, e)
+    try:
+        token = open(TOKEN_PATH)
+    except FileNotFoundError:
+        return None
+    with token:
+        _lock_file(token, exclusive=False)
+        return token.read()
+
+
+def _save_credentials(creds):
+    """Persists rotated credentials, preferring the keyring over the token file."""
+    data = creds.to_json()
+    try:
+        keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, data)
+        return
+    except Exception as e:
+        logger.warning("Keyring unavailable, writing %s instead: %s", TOKEN_PATH, e)
+    # Open without truncating so the file is only emptied once we hold the lock
+    with open(TOKEN_PATH, "a+") as token:
+        _lock_file(token, exclusive=True)
+        token.seek(0)
+        token.truncate()
+        token.write(data)
+
+
+def get_credentials():
+    """Returns cached Calendar API credentials, refreshing them only when invalid."""
+    global _CREDS
+    creds = _CREDS
+    if creds and creds.valid:
+        return creds
+    with _LOCK:
+        # Another caller may have refreshed while we waited for the lock.
+        if not (_CREDS and _CREDS.valid):
+            _CREDS = _load_credentials(_CREDS)
+        return _CREDS
+
+
+def _refresh_cached_credentials():
+    """Refreshes the cached token ahead of expiry (runs in a worker thread)."""
+    global _CREDS
+    with _LOCK:
+        creds = _CREDS
+        if creds is None or not creds.refresh_token:
+            return
+        try:
+            creds.refresh(Request())
+        except RefreshError as e:
+            if not e.retryable:
+                # A revoked or expired refresh token won't recover on retry,
+                # so the next tool call re-runs the consent flow instead
+                _CREDS = None
+            raise
+        _save_credentials(creds)
+
+
+async def refresh_forever():
+    """Keeps the cached token fresh so tool calls rarely refresh inline.
+
+    get_credentials() still refreshes on the request path as a fallback if
+    this loop falls behind (e.g. clock skew or a failed background refresh).
+    """
+    while True:
+        creds = _CREDS
+        delay = REFRESH_POLL_SECONDS
+        if creds is not None and creds.expiry is not None and creds.refresh_token:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            delay = min(delay, (creds.expiry - REFRESH_MARGIN - now).total_seconds())
+        if delay > 0:
+            await asyncio.sleep(delay)
+            continue
+        try:
+            await asyncio.to_thread(_refresh_cached_credentials)
+        except RefreshError as e:
+            if e.retryable:
+                logger.warning("Background token refresh failed: %s", e)
+                await asyncio.sleep(REFRESH_POLL_SECONDS)
+            else:
+                logger.error("Token refresh was rejected, re-authorization needed: %s", e)
+        except Exception as e:
+            logger.warning("Background token refresh failed: %s", e)
+            await asyncio.sleep(REFRESH_POLL_SECONDS)
+
+
+def api_executor():
+    """Returns the bounded thread pool that tool calls run their API requests on."""
+    return ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="calendar-api")
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson instead of stdlib json."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Keep googleapiclient's handling of non-JSON bodies
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document():
+    # The Calendar discovery document bundled with googleapiclient, read from
+    # disk once per process rather than once per worker thread's client
+    return get_static_doc("calendar", "v3")
+
+
+def _build_service(creds):
+    return build_from_document(
+        _discovery_document(),
+        http=AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT)),
+        model=_OrjsonModel(),
+    )
+
+
+def get_service():
+    """Returns this thread's cached Calendar API client for the current credentials."""
+    creds = get_credentials()
+    cached = getattr(_LOCAL, "service", None)
+    # A re-authorized (new) credentials object rebuilds the client, while
+    # in-place refreshes keep reusing it.
+    if cached is None or cached[0] is not creds:
+        cached = _LOCAL.service = (creds, _build_service(creds))
+    return cached[1]
+
+
+def event_time(boundary):
+    """Returns an event start/end's dateTime, falling back to its all-day date."""
+    value = boundary.get('dateTime')
+    return value if value is not None else boundary.get('date')
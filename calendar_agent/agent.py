@@ -4,22 +4,25 @@ from create_event_tool import create_event
 from search_events_tool import search_events
 from delete_event_tool import delete_event
 from update_event_tool import update_event
+from batch_events_tool import batch_events
 
 agent_instruction = """
 You are an assistant that can help manage a user's Google Calendar.
 
-You have five tools available:
+You have six tools available:
 - `list_events`: Use this when the user asks for their upcoming events or wants to see what's on their calendar. You can specify how many events to show and how many days ahead to look.
 - `create_event`: Use this when the user wants to create a new calendar event. You'll need the event title (summary), start time, and end time. You can also add optional details like description, location, and attendees.
 - `search_events`: Use this when the user wants to find specific events. The search query can match event titles, descriptions, locations, or attendee names.
 - `update_event`: Use this when the user wants to modify an existing event. You'll need the event ID and can update any field like title, time, location, description, or attendees.
 - `delete_event`: Use this when the user wants to remove an event from their calendar. You'll need the event ID.
+- `batch_events`: Use this when you need to run several independent operations at once (for example deleting or updating multiple events, or creating several events). Each operation has an `op` of "get", "create", "update" or "delete" plus the same fields the single-event tools take. Don't batch operations that depend on each other's results.
 
 Important notes:
 - Times should be in ISO format (e.g., "2024-12-25T10:00:00")
 - When searching or listing events, you may need to ask the user to search or update using the event ID from the results
 - Always confirm with the user before deleting events
 - When creating events with attendees, notifications will be sent automatically
+- `list_events` and `search_events` only read the calendar, so when you need several independent lookups (e.g. two searches, or a search and a listing) request them together in the same turn so they run in parallel. Only wait for a result when the next call needs something from it, such as an event ID
 """
 
 def create_agent() -> LlmAgent:
@@ -34,6 +37,7 @@ def create_agent() -> LlmAgent:
         create_event,
         search_events,
         update_event,
-        delete_event
+        delete_event,
+        batch_events
     ],
 )
@@ -0,0 +1,156 @@
+import asyncio
+from typing import List
+from _google_common import event_time, get_service
+from create_event_tool import build_event_body
+from search_events_tool import invalidate_search_cache
+from update_event_tool import build_patch_body
+
+# Google Calendar accepts at most 50 calls per batch request
+MAX_BATCH_SIZE = 50
+
+
+def _build_request(events, operation, calendar_id):
+    """Maps one operation dict onto the matching Calendar API request."""
+    op = operation.get('op')
+    if op == 'get':
+        return events.get(calendarId=calendar_id, eventId=operation['event_id'])
+    if op == 'create':
+        attendees = operation.get('attendees')
+        body = build_event_body(
+            operation['summary'],
+            operation['start_datetime'],
+            operation['end_datetime'],
+            operation.get('description'),
+            operation.get('location'),
+            attendees,
+            operation.get('timezone') or 'UTC',
+        )
+        return events.insert(
+            calendarId=calendar_id, body=body, sendUpdates='all' if attendees else 'none'
+        )
+    if op == 'update':
+        return events.patch(
+            calendarId=calendar_id,
+            eventId=operation['event_id'],
+            body=build_patch_body(
+                operation.get('summary'),
+                operation.get('start_datetime'),
+                operation.get('end_datetime'),
+                operation.get('description'),
+                operation.get('location'),
+                operation.get('attendees'),
+                operation.get('timezone'),
+            ),
+            sendUpdates='all'
+        )
+    if op == 'delete':
+        return events.delete(
+            calendarId=calendar_id, eventId=operation['event_id'], sendUpdates='all'
+        )
+    raise ValueError(f"Unsupported operation '{op}'")
+
+
+def _format_result(index, operation, response):
+    result = {"index": index, "op": operation.get('op'), "status": "success"}
+    if not response:
+        # delete returns an empty body
+        result["event_id"] = operation.get('event_id')
+        return result
+    result.update({
+        "event_id": response['id'],
+        "summary": response.get('summary'),
+        "start": event_time(response['start']),
+        "end": event_time(response['end']),
+        "html_link": response.get('htmlLink', '')
+    })
+    return result
+
+
+async def batch_events(operations: List[dict], calendar_id: str = "primary") -> dict:
+    """
+    Runs several independent calendar operations in a single batched HTTP request.
+
+    Args:
+        operations (List[dict]): Operations to run. Each item needs an "op" key of
+            "get", "create", "update" or "delete" plus the fields for that operation:
+            - get / delete: "event_id"
+            - create: "summary", "start_datetime", "end_datetime" and optionally
+              "description", "location", "attendees", "timezone"
+            - update: "event_id" plus any of "summary", "start_datetime",
+              "end_datetime", "description", "location", "attendees", "timezone"
+        calendar_id (str): Calendar ID the operations apply to. Defaults to "primary".
+
+    Returns:
+        dict: Per-operation results in the order given.
+        {
+            "status": "success" | "partial" | "error",
+            "count": int,
+            "results": [
+                {
+                    "index": int,
+                    "op": str,
+                    "status": "success" | "error",
+                    "event_id": str,
+                    "summary": str (get/create/update),
+                    "start": str (get/create/update),
+                    "end": str (get/create/update),
+                    "html_link": str (get/create/update),
+                    "details": str (on error)
+                }
+            ]
+        }
+    """
+    result = await asyncio.to_thread(_batch_events, operations, calendar_id)
+    if any(operation.get('op') != 'get' for operation in operations):
+        invalidate_search_cache()
+    return result
+
+
+def _batch_events(operations, calendar_id):
+    results = [None] * len(operations)
+
+    def on_response(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            results[index] = {
+                "index": index,
+                "op": operations[index].get('op'),
+                "status": "error",
+                "event_id": operations[index].get('event_id'),
+                "details": str(exception)
+            }
+        else:
+            results[index] = _format_result(index, operations[index], response)
+
+    try:
+        service = get_service()
+        events = service.events()
+
+        for start in range(0, len(operations), MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for index in range(start, min(start + MAX_BATCH_SIZE, len(operations))):
+                try:
+                    request = _build_request(events, operations[index], calendar_id)
+                except KeyError as e:
+                    on_response(str(index), None, ValueError(f"Missing field {e}"))
+                    continue
+                except ValueError as e:
+                    on_response(str(index), None, e)
+                    continue
+                batch.add(request, request_id=str(index))
+            batch.execute()
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": "An unexpected error occurred",
+            "details": str(e),
+            "results": [result for result in results if result is not None]
+        }
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {
+        "status": "success" if not failed else ("error" if failed == len(results) else "partial"),
+        "count": len(results),
+        "results": results
+    }
@@ -1,49 +1,52 @@
-import os
-from datetime import datetime
+import asyncio
 from typing import Optional, List
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from _google_common import event_time, get_service
+from search_events_tool import invalidate_search_cache
 
-# Calendar API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Calendar API."""
-    creds = None
-    if os.path.exists("token_calendar.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_calendar.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_calendar.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_calendar.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def create_event(
+
+def _build_event_minimal(summary, start_datetime, end_datetime, timezone):
+    """Body for the common case of an event with only a title and times."""
+    return {
+        'summary': summary,
+        'start': {'dateTime': start_datetime, 'timeZone': timezone},
+        'end': {'dateTime': end_datetime, 'timeZone': timezone},
+    }
+
+
+def _build_event_full(
+    summary, start_datetime, end_datetime, timezone, description, location, attendees
+):
+    """Body for an event with a description, location or attendees."""
+    event = _build_event_minimal(summary, start_datetime, end_datetime, timezone)
+    if description:
+        event['description'] = description
+    if location:
+        event['location'] = location
+    if attendees:
+        event['attendees'] = [{'email': email} for email in attendees]
+    return event
+
+
+def build_event_body(
+    summary,
+    start_datetime,
+    end_datetime,
+    description=None,
+    location=None,
+    attendees=None,
+    timezone="UTC",
+):
+    """Builds the Calendar API body for a new timed event."""
+    # Most events have none of the optional fields, so skip their checks entirely
+    if description or location or attendees:
+        return _build_event_full(
+            summary, start_datetime, end_datetime, timezone, description, location, attendees
+        )
+    return _build_event_minimal(summary, start_datetime, end_datetime, timezone)
+
+
+async def create_event(
     summary: str,
     start_datetime: str,
     end_datetime: str,
@@ -85,30 +88,38 @@ def create_event(
             "details": str
         }
     """
+    result = await asyncio.to_thread(
+        _create_event,
+        summary,
+        start_datetime,
+        end_datetime,
+        description,
+        location,
+        attendees,
+        timezone,
+        calendar_id,
+    )
+    if result["status"] == "success":
+        invalidate_search_cache()
+    return result
+
+
+def _create_event(
+    summary,
+    start_datetime,
+    end_datetime,
+    description,
+    location,
+    attendees,
+    timezone,
+    calendar_id,
+):
     try:
-        creds = _get_credentials()
-        service = build("calendar", "v3", credentials=creds)
-
-        # Build event body
-        event = {
-            'summary': summary,
-            'start': {
-                'dateTime': start_datetime,
-                'timeZone': timezone,
-            },
-            'end': {
-                'dateTime': end_datetime,
-                'timeZone': timezone,
-            },
-        }
+        service = get_service()
 
-        # Add optional fields
-        if description:
-            event['description'] = description
-        if location:
-            event['location'] = location
-        if attendees:
-            event['attendees'] = [{'email': email} for email in attendees]
+        event = build_event_body(
+            summary, start_datetime, end_datetime, description, location, attendees, timezone
+        )
 
         # Create the event
         created_event = service.events().insert(
@@ -122,8 +133,8 @@ def create_event(
             "message": "Event created successfully",
             "event_id": created_event['id'],
             "summary": created_event.get('summary'),
-            "start": created_event['start'].get('dateTime', created_event['start'].get('date')),
-            "end": created_event['end'].get('dateTime', created_event['end'].get('date')),
+            "start": event_time(created_event['start']),
+            "end": event_time(created_event['end']),
             "html_link": created_event.get('htmlLink', ''),
             "location": created_event.get('location', 'No location specified')
         }
@@ -1,47 +1,9 @@
-import os
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import asyncio
 from googleapiclient.errors import HttpError
+from _google_common import get_service
+from search_events_tool import invalidate_search_cache
 
-# Calendar API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Calendar API."""
-    creds = None
-    if os.path.exists("token_calendar.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_calendar.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_calendar.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_calendar.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def delete_event(event_id: str, calendar_id: str = "primary") -> dict:
+async def delete_event(event_id: str, calendar_id: str = "primary") -> dict:
     """
     Deletes an event from the user's calendar.
 
@@ -65,9 +27,15 @@ def delete_event(event_id: str, calendar_id: str = "primary") -> dict:
             "event_id": str
         }
     """
+    result = await asyncio.to_thread(_delete_event, event_id, calendar_id)
+    if result["status"] == "success":
+        invalidate_search_cache()
+    return result
+
+
+def _delete_event(event_id, calendar_id):
     try:
-        creds = _get_credentials()
-        service = build("calendar", "v3", credentials=creds)
+        service = get_service()
 
         # Delete the event
         service.events().delete(
@@ -1,49 +1,42 @@
-import os
-from datetime import datetime, timedelta
+import asyncio
+import time
 from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from _google_common import event_time, get_service
+
+_RFC3339_UTC = "%04d-%02d-%02dT%02d:%02d:%02dZ"
+
+
+def _rfc3339(timestamp):
+    """Formats a POSIX timestamp as an RFC3339 UTC string (second precision)."""
+    return _RFC3339_UTC % time.gmtime(timestamp)[:6]
+
+
+def _format_event(event):
+    """Reshapes a Calendar API event, dropping optional fields it doesn't have."""
+    g = event.get
+    attendees = g('attendees')
+    return {key: value for key, value in (
+        ("id", event['id']),
+        ("summary", g('summary', '(No Title)')),
+        # Handle both date and dateTime formats
+        ("start", event_time(event['start'])),
+        ("end", event_time(event['end'])),
+        ("status", g('status', 'confirmed')),
+        ("html_link", g('htmlLink', '')),
+        ("location", g('location')),
+        ("description", g('description')),
+        ("attendees", [
+            {
+                'email': attendee.get('email'),
+                'responseStatus': attendee.get('responseStatus', 'needsAction')
+            }
+            for attendee in attendees
+        ] if attendees is not None else None),
+    ) if value is not None}
+
 
-# Calendar API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Calendar API."""
-    creds = None
-    if os.path.exists("token_calendar.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_calendar.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_calendar.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_calendar.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def list_events(max_results: int = 10, days_ahead: int = 7, calendar_id: str = "primary") -> dict:
+async def list_events(max_results: int = 10, days_ahead: int = 7, calendar_id: str = "primary") -> dict:
     """
     Lists upcoming events from the user's calendar.
 
@@ -71,17 +64,17 @@ def list_events(max_results: int = 10, days_ahead: int = 7, calendar_id: str = "
             ]
         }
     """
-    try:
-        creds = _get_credentials()
-        service = build("calendar", "v3", credentials=creds)
+    return await asyncio.to_thread(_list_events, max_results, days_ahead, calendar_id)
 
-        # Get current time and time limit
-        now = datetime.utcnow()
-        time_max = now + timedelta(days=days_ahead)
 
-        # Format as RFC3339 timestamp
-        time_min = now.isoformat() + 'Z'
-        time_max_str = time_max.isoformat() + 'Z'
+def _list_events(max_results, days_ahead, calendar_id):
+    try:
+        service = get_service()
+
+        # Get current time and time limit as RFC3339 timestamps
+        now = time.time()
+        time_min = _rfc3339(now)
+        time_max_str = _rfc3339(now + days_ahead * 86400)
 
         # Fetch events
         events_result = service.events().list(
@@ -90,7 +83,9 @@ def list_events(max_results: int = 10, days_ahead: int = 7, calendar_id: str = "
             timeMax=time_max_str,
             maxResults=max_results,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            # Only ask for the fields we format below
+            fields="items(id,summary,start,end,location,description,status,htmlLink,attendees(email,responseStatus))"
         ).execute()
 
         events = events_result.get('items', [])
@@ -102,41 +97,12 @@ def list_events(max_results: int = 10, days_ahead: int = 7, calendar_id: str = "
                 "message": f"No upcoming events found in the next {days_ahead} days."
             }
 
-        formatted_events = []
-        for event in events:
-            # Handle both date and dateTime formats
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-
-            formatted_event = {
-                "id": event['id'],
-                "summary": event.get('summary', '(No Title)'),
-                "start": start,
-                "end": end,
-                "status": event.get('status', 'confirmed'),
-                "html_link": event.get('htmlLink', '')
-            }
-
-            # Add optional fields if present
-            if 'location' in event:
-                formatted_event['location'] = event['location']
-            if 'description' in event:
-                formatted_event['description'] = event['description']
-            if 'attendees' in event:
-                formatted_event['attendees'] = [
-                    {
-                        'email': attendee.get('email'),
-                        'responseStatus': attendee.get('responseStatus', 'needsAction')
-                    }
-                    for attendee in event['attendees']
-                ]
-
-            formatted_events.append(formatted_event)
+        formatted_events = [_format_event(event) for event in events]
 
         return {
             "count": len(formatted_events),
             "events": formatted_events,
-            "time_range": f"Next {days_ahead} days from {now.strftime('%Y-%m-%d')}"
+            "time_range": f"Next {days_ahead} days from {time_min[:10]}"
         }
 
     except HttpError as error:
@@ -1,48 +1,36 @@
-import os
+import asyncio
 from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from cachetools import TTLCache
 from googleapiclient.errors import HttpError
+from _google_common import event_time, get_service
 
-# Calendar API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Calendar API."""
-    creds = None
-    if os.path.exists("token_calendar.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_calendar.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_calendar.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_calendar.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def search_events(
+# Recent search results keyed by (query, max_results, calendar_id). Every
+# successful create/update/delete clears it so stale events aren't served.
+_search_cache = TTLCache(maxsize=256, ttl=30)
+
+
+def invalidate_search_cache():
+    """Drops all cached search results after the calendar has changed."""
+    _search_cache.clear()
+
+
+def _format_event(event):
+    """Reshapes a Calendar API event, dropping optional fields it doesn't have."""
+    g = event.get
+    return {key: value for key, value in (
+        ("id", event['id']),
+        ("summary", g('summary', '(No Title)')),
+        # Handle both date and dateTime formats
+        ("start", event_time(event['start'])),
+        ("end", event_time(event['end'])),
+        ("status", g('status', 'confirmed')),
+        ("html_link", g('htmlLink', '')),
+        ("location", g('location')),
+        ("description", g('description')),
+    ) if value is not None}
+
+
+async def search_events(
     query: str,
     max_results: int = 10,
     calendar_id: str = "primary"
@@ -74,9 +62,20 @@ def search_events(
             ]
         }
     """
+    key = (query, max_results, calendar_id)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await asyncio.to_thread(_search_events, query, max_results, calendar_id)
+    if result.get("status") != "error":
+        _search_cache[key] = result
+    return result
+
+
+def _search_events(query, max_results, calendar_id):
     try:
-        creds = _get_credentials()
-        service = build("calendar", "v3", credentials=creds)
+        service = get_service()
 
         # Search for events using the text query
         events_result = service.events().list(
@@ -84,7 +83,9 @@ def search_events(
             q=query,
             maxResults=max_results,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            # Only ask for the fields we format below
+            fields="items(id,summary,start,end,location,description,status,htmlLink)"
         ).execute()
 
         events = events_result.get('items', [])
@@ -97,28 +98,7 @@ def search_events(
                 "message": f"No events found matching '{query}'."
             }
 
-        formatted_events = []
-        for event in events:
-            # Handle both date and dateTime formats
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-
-            formatted_event = {
-                "id": event['id'],
-                "summary": event.get('summary', '(No Title)'),
-                "start": start,
-                "end": end,
-                "status": event.get('status', 'confirmed'),
-                "html_link": event.get('htmlLink', '')
-            }
-
-            # Add optional fields if present
-            if 'location' in event:
-                formatted_event['location'] = event['location']
-            if 'description' in event:
-                formatted_event['description'] = event['description']
-
-            formatted_events.append(formatted_event)
+        formatted_events = [_format_event(event) for event in events]
 
         return {
             "count": len(formatted_events),
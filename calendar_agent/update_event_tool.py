@@ -1,48 +1,45 @@
-import os
+import asyncio
+import re
 from typing import Optional, List
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-
-# Calendar API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/calendar"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Calendar API."""
-    creds = None
-    if os.path.exists("token_calendar.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_calendar.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_calendar.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_calendar.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def update_event(
+from _google_common import NUM_RETRIES, event_time, get_service
+from search_events_tool import invalidate_search_cache
+
+
+_OFFSET_RE = re.compile(r'(Z|[+-]\d{2}:?\d{2})$')
+
+
+def build_patch_body(
+    summary=None,
+    start_datetime=None,
+    end_datetime=None,
+    description=None,
+    location=None,
+    attendees=None,
+    timezone=None,
+):
+    """Builds a partial event body holding only the fields that were provided."""
+    body = {
+        key: value for key, value in (
+            ('summary', summary),
+            ('description', description),
+            ('location', location),
+        ) if value is not None
+    }
+    for key, value in (('start', start_datetime), ('end', end_datetime)):
+        if value is not None:
+            # Clearing 'date' turns an all-day event into a timed one, which
+            # has no timeZone to fall back on, so offset-less times always
+            # name one (UTC unless given)
+            body[key] = {'dateTime': value, 'date': None}
+            if timezone or not _OFFSET_RE.search(value):
+                body[key]['timeZone'] = timezone or 'UTC'
+    if attendees is not None:
+        body['attendees'] = [{'email': email} for email in attendees]
+    return body
+
+
+async def update_event(
     event_id: str,
     summary: Optional[str] = None,
     start_datetime: Optional[str] = None,
@@ -64,7 +61,8 @@ def update_event(
         description (str, optional): New description of the event.
         location (str, optional): New location of the event.
         attendees (List[str], optional): New list of attendee email addresses.
-        timezone (str, optional): New timezone for the event.
+        timezone (str, optional): New timezone for the event. New times without
+            a UTC offset are taken as UTC when no timezone is given.
         calendar_id (str): Calendar ID containing the event. Defaults to "primary".
 
     Returns:
@@ -87,65 +85,55 @@ def update_event(
             "event_id": str
         }
     """
+    result = await asyncio.to_thread(
+        _update_event,
+        event_id,
+        summary,
+        start_datetime,
+        end_datetime,
+        description,
+        location,
+        attendees,
+        timezone,
+        calendar_id,
+    )
+    if result["status"] == "success":
+        invalidate_search_cache()
+    return result
+
+
+def _update_event(
+    event_id,
+    summary,
+    start_datetime,
+    end_datetime,
+    description,
+    location,
+    attendees,
+    timezone,
+    calendar_id,
+):
     try:
-        creds = _get_credentials()
-        service = build("calendar", "v3", credentials=creds)
-
-        # First, retrieve the existing event
-        event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-
-        # Update only the fields that were provided
-        if summary is not None:
-            event['summary'] = summary
-
-        if start_datetime is not None:
-            if 'dateTime' in event['start']:
-                event['start']['dateTime'] = start_datetime
-                if timezone:
-                    event['start']['timeZone'] = timezone
-            else:
-                # Convert all-day event to timed event
-                event['start'] = {
-                    'dateTime': start_datetime,
-                    'timeZone': timezone if timezone else 'UTC'
-                }
-
-        if end_datetime is not None:
-            if 'dateTime' in event['end']:
-                event['end']['dateTime'] = end_datetime
-                if timezone:
-                    event['end']['timeZone'] = timezone
-            else:
-                # Convert all-day event to timed event
-                event['end'] = {
-                    'dateTime': end_datetime,
-                    'timeZone': timezone if timezone else 'UTC'
-                }
-
-        if description is not None:
-            event['description'] = description
-
-        if location is not None:
-            event['location'] = location
-
-        if attendees is not None:
-            event['attendees'] = [{'email': email} for email in attendees]
+        service = get_service()
 
-        # Update the event
-        updated_event = service.events().update(
+        # Patch sends only the provided fields in a single request, with no
+        # prior get of the full event
+        updated_event = service.events().patch(
             calendarId=calendar_id,
             eventId=event_id,
-            body=event,
-            sendUpdates='all' if 'attendees' in event else 'none'
-        ).execute()
+            body=build_patch_body(
+                summary, start_datetime, end_datetime, description, location, attendees, timezone
+            ),
+            sendUpdates='all'  # Only attendees are notified, so this is a no-op without them
+        ).execute(num_retries=NUM_RETRIES)
 
         return {
             "status": "success",
             "message": "Event updated successfully",
             "event_id": updated_event['id'],
             "summary": updated_event.get('summary'),
-            "start": updated_event['start'].get('dateTime', updated_event['start'].get('date')),
-            "end": updated_event['end'].get('dateTime', updated_event['end'].get('date')),
+            "start": event_time(updated_event['start']),
+            "end": event_time(updated_event['end']),
             "html_link": updated_event.get('htmlLink', ''),
             "location": updated_event.get('location', 'No location specified')
         }
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import logging
 import os
 
@@ -10,6 +12,8 @@ from a2a.types import (
     AgentCard,
     AgentSkill,
 )
+from _auth import refresh_forever
+from attachment_tool import DOWNLOAD_PATH, DOWNLOAD_ROUTE, set_download_host
 from agent import create_agent
 from agent_executor import GmailAgentExecutor
 from dotenv import load_dotenv
@@ -17,6 +21,7 @@ from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
+from starlette.staticfiles import StaticFiles
 
 load_dotenv()
 
@@ -30,6 +35,16 @@ class MissingAPIKeyError(Exception):
     pass
 
 
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Runs the OAuth token refresher alongside the server."""
+    refresher = asyncio.create_task(refresh_forever())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+
+
 def main():
     """Starts the agent server."""
     host = "localhost"
@@ -79,6 +94,13 @@ def main():
                 tags=["email", "compose", "send"],
                 examples=["Email Taylor confirming the meeting tomorrow.", "Send a thank-you note to info@example.com."],
             ),
+            AgentSkill(
+                id="gmail_bulk_trash",
+                name="Trash Emails in Bulk",
+                description="Moves many emails to the trash in a single request.",
+                tags=["email", "trash", "delete", "bulk"],
+                examples=["Trash all the promotional emails you just found.", "Delete these 30 newsletters."],
+            ),
         ]
         agent_card = AgentCard(
             name="Gmail Agent",
@@ -109,7 +131,12 @@ def main():
             agent_card=agent_card, http_handler=request_handler
         )
 
-        uvicorn.run(server.build(), host=host, port=port)
+        # Serve downloaded attachments from this server instead of a second one
+        app = server.build(lifespan=lifespan)
+        app.mount(DOWNLOAD_ROUTE, StaticFiles(directory=DOWNLOAD_PATH), name="downloads")
+        set_download_host(host, port)
+
+        uvicorn.run(app, host=host, port=port)
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e}")
         exit(1)
@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+import httplib2
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Using a more permissive scope to allow for searching and other actions
+SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+FIXED_PORT = 8080
+TOKEN_PATH = "token.json"
+
+# Retries (with exponential backoff) for transient 429/5xx API responses
+NUM_RETRIES = 3
+
+# Gmail recommends at most 50 calls per batch request
+MAX_BATCH_SIZE = 50
+
+# The background refresher renews the token this long before it expires and
+# re-checks the cached credentials at least this often.
+REFRESH_MARGIN = timedelta(minutes=5)
+REFRESH_POLL_SECONDS = 60
+
+# Process-lifetime cache shared by the Gmail tools. The token file is only
+# re-read when its mtime changes (another process rewrote it) and the
+# credentials are only rebuilt when they stop being valid.
+_CREDS = None
+_TOKEN_MTIME = None
+_LOCK = threading.Lock()
+
+# Some tools run their blocking API calls in worker threads and httplib2.Http
+# is not thread-safe, so each thread keeps its own client and keep-alive
+# transport, reused across every tool call that lands on that thread.
+_LOCAL = threading.local()
+
+
+def _load_credentials(creds):
+    """Loads, refreshes or re-authorizes credentials and persists the token."""
+    if creds is None:
+        try:
+            creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Error loading %s: %s. Will re-authenticate.", TOKEN_PATH, e)
+            creds = None
+    if not creds or not creds.valid:
+        # Only write the token back if it was refreshed or newly obtained
+        needs_save = False
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                needs_save = True
+            except Exception as e:
+                # Refresh failed, need full re-auth
+                logger.warning("Token refresh failed: %s", e)
+                creds = None
+
+        if not creds:  # Either no token or refresh failed
+            # Only needed for the one-time consent flow, so not imported up front
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                "credentials.json", SCOPES
+            )
+            creds = flow.run_local_server(
+                port=FIXED_PORT,
+                access_type='offline',
+                prompt='consent'
+            )
+            needs_save = True
+
+        if needs_save:
+            _save_credentials(creds)
+    return creds
+
+
+def _token_mtime():
+    try:
+        return os.stat(TOKEN_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _save_credentials(creds):
+    global _TOKEN_MTIME
+    with open(TOKEN_PATH, "w") as token:
+        token.write(creds.to_json())
+    # Our own write shouldn't trigger a reload
+    _TOKEN_MTIME = _token_mtime()
+
+
+def get_credentials():
+    """Returns cached Gmail API credentials, refreshing them only when invalid."""
+    global _CREDS, _TOKEN_MTIME
+    creds = _CREDS
+    if creds and creds.valid and _token_mtime() == _TOKEN_MTIME:
+        return creds
+    with _LOCK:
+        mtime = _token_mtime()
+        if mtime != _TOKEN_MTIME:
+            # The token file changed on disk, so load it instead of our copy
+            _CREDS = None
+            _TOKEN_MTIME = mtime
+        # Another caller may have refreshed while we waited for the lock.
+        if not (_CREDS and _CREDS.valid):
+            _CREDS = _load_credentials(_CREDS)
+        return _CREDS
+
+
+def _refresh_cached_credentials():
+    """Refreshes the cached token ahead of expiry (runs in a worker thread)."""
+    global _CREDS
+    with _LOCK:
+        creds = _CREDS
+        if creds is None or not creds.refresh_token:
+            return
+        try:
+            creds.refresh(Request())
+        except RefreshError as e:
+            if not e.retryable:
+                # A revoked or expired refresh token won't recover on retry,
+                # so the next tool call re-runs the consent flow instead
+                _CREDS = None
+            raise
+        _save_credentials(creds)
+
+
+async def refresh_forever():
+    """Keeps the cached token fresh so tool calls rarely refresh inline.
+
+    get_credentials() still refreshes on the request path as a fallback if
+    this loop falls behind (e.g. clock skew or a failed background refresh).
+    """
+    while True:
+        creds = _CREDS
+        delay = REFRESH_POLL_SECONDS
+        if creds is not None and creds.expiry is not None and creds.refresh_token:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            delay = min(delay, (creds.expiry - REFRESH_MARGIN - now).total_seconds())
+        if delay > 0:
+            await asyncio.sleep(delay)
+            continue
+        try:
+            await asyncio.to_thread(_refresh_cached_credentials)
+        except RefreshError as e:
+            if e.retryable:
+                logger.warning("Background token refresh failed: %s", e)
+                await asyncio.sleep(REFRESH_POLL_SECONDS)
+            else:
+                logger.error("Token refresh was rejected, re-authorization needed: %s", e)
+        except Exception as e:
+            logger.warning("Background token refresh failed: %s", e)
+            await asyncio.sleep(REFRESH_POLL_SECONDS)
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(api, version):
+    # The discovery document bundled with googleapiclient, read from disk once
+    # per process rather than once per worker thread's client
+    return get_static_doc(api, version)
+
+
+def _build_service(api, version, creds):
+    # Building from the bundled document means no discovery fetch, and one
+    # authorized transport per client keeps its keep-alive connection to the
+    # API host in use across requests.
+    return build_from_document(
+        _discovery_document(api, version),
+        http=AuthorizedHttp(creds, http=httplib2.Http(timeout=30)),
+    )
+
+
+def get_service():
+    """Returns this thread's cached Gmail API client for the current credentials."""
+    creds = get_credentials()
+    cached = getattr(_LOCAL, "service", None)
+    # A re-authorized (new) credentials object rebuilds the client, while
+    # in-place refreshes keep reusing it.
+    if cached is None or cached[0] is not creds:
+        cached = _LOCAL.service = (creds, _build_service("gmail", "v1", creds))
+    return cached[1]
+
+
+def _is_transient(error):
+    return isinstance(error, HttpError) and (error.resp.status == 429 or error.resp.status >= 500)
+
+
+def get_messages(service, message_ids, **params):
+    """Fetches several messages through batch requests, returned in the order given.
+
+    Batches don't retry their parts, so parts failing with a 429/5xx are
+    re-fetched one at a time with backoff. Raises the first error left,
+    matching a plain messages().get().execute().
+    """
+    messages = service.users().messages()
+    results = [None] * len(message_ids)
+    errors = {}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            errors[int(request_id)] = exception
+        else:
+            results[int(request_id)] = response
+
+    for start in range(0, len(message_ids), MAX_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for index in range(start, min(start + MAX_BATCH_SIZE, len(message_ids))):
+            batch.add(
+                messages.get(userId='me', id=message_ids[index], **params),
+                request_id=str(index)
+            )
+        batch.execute()
+        for index in sorted(errors):
+            if not _is_transient(errors[index]):
+                raise errors[index]
+            results[index] = messages.get(userId='me', id=message_ids[index], **params).execute(
+                num_retries=NUM_RETRIES
+            )
+        errors.clear()
+    return results
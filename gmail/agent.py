@@ -3,17 +3,19 @@ from gmail_tool import get_latest_emails
 from search_tool import search_emails
 from attachment_tool import download_email_attachments
 from send_email_tool import send_email
+from bulk_modify_tool import bulk_trash_emails
 from email_details_tool import get_email_details
 
 agent_instruction = """
 You are an assistant that can help manage a user's Gmail inbox.
 
-You have five tools available:
+You have six tools available:
 - `get_latest_email`: Use this when the user asks for their most recent email.
 - `search_emails`: Use this when the user wants to find specific emails. You will need to ask them for a search query, like 'from:amazon' or 'subject:receipt'.
 - `get_email_details`: Use this when the user wants complete information about a specific email given its ID. This includes full headers, body content, labels, and attachment information.
 - `download_email_attachments`: Use this when the user wants to download attachments from a specific email. You'll need the email ID.
 - `send_email`: Use this when the user wants to send an email. You'll need the recipient address, subject, and body. Optionally support CC and BCC.
+- `bulk_trash_emails`: Use this when the user wants to delete or trash several emails at once. Pass all of their IDs in a single call rather than one call per email.
 """
 
 
@@ -22,13 +24,14 @@ def create_agent() -> LlmAgent:
     return LlmAgent(
     model="gemini-3.1-flash-lite",
     name="email_agent",
-    description="A helpful assistant for managing Gmail. It can retrieve the most recent email, perform searches using keywords, senders, or subjects to find specific messages, get full details of a specific email by ID, download all attachments from an email and return localhost download links, and send emails to recipients.",
+    description="A helpful assistant for managing Gmail. It can retrieve the most recent email, perform searches using keywords, senders, or subjects to find specific messages, get full details of a specific email by ID, download all attachments from an email and return localhost download links, send emails to recipients, and move many emails to the trash at once.",
     instruction=agent_instruction,
     tools=[
         get_latest_emails,
         search_emails,
         get_email_details,
         download_email_attachments,
-        send_email
+        send_email,
+        bulk_trash_emails
     ],
 )
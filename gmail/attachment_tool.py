@@ -1,107 +1,57 @@
 import os
-import base64
-import threading
-import socket
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from io import BytesIO
+from binascii import a2b_base64
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-
-# Using a more permissive scope to allow for searching and other actions
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
-FIXED_PORT = 8080
-FILE_SERVER_PORT = 8000
-
-# Global variables to track the file server
-_file_server = None
-_file_server_thread = None
-_download_path = None
-
-def _get_credentials():
-    """Helper function to get user credentials."""
-    creds = None
-    if os.path.exists("token.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def _is_port_in_use(port: int) -> bool:
-    """Check if a port is already in use."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
-
-def _start_file_server(download_path: str):
-    """Start a simple HTTP server to serve downloaded files (singleton)."""
-    global _file_server, _file_server_thread, _download_path, FILE_SERVER_PORT
-
-    # If server is already running and serving the same path, return existing server info
-    if _file_server and _file_server_thread and _file_server_thread.is_alive() and _download_path == download_path:
-        return {"server": _file_server, "port": FILE_SERVER_PORT}
-
-    # Find an available port
-    port = FILE_SERVER_PORT
-    max_port = FILE_SERVER_PORT + 10
-
-    while _is_port_in_use(port) and port < max_port:
-        port += 1
-
-    # If all ports are in use, raise an error
-    if port >= max_port:
-        raise RuntimeError(f"Could not find available port between {FILE_SERVER_PORT} and {max_port}")
-
-    class FileHandler(SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=download_path, **kwargs)
-
-        def log_message(self, format_string, *args):
-            # Suppress server logs to keep console clean
-            pass
-
-    try:
-        _file_server = HTTPServer(('localhost', port), FileHandler)
-        _file_server_thread = threading.Thread(target=_file_server.serve_forever, daemon=True)
-        _file_server_thread.start()
-        _download_path = download_path
-
-        # Update the global port variable for URL generation
-        FILE_SERVER_PORT = port
-
-        return {"server": _file_server, "port": port}
-    except Exception as e:
-        raise RuntimeError(f"Could not start file server on port {port}: {e}")
+from _auth import NUM_RETRIES, get_service
+from email_details_tool import get_cached_message
+
+# Gmail recommends at most 50 calls per batch request
+MAX_BATCH_SIZE = 50
+# Threads used to decode and write downloaded attachments
+MAX_WRITE_WORKERS = 8
+# Base64 characters decoded per write; a multiple of 4 so every slice decodes on its own
+DECODE_CHUNK_SIZE = 1024 * 1024
+# Maps Gmail's URL-safe base64 alphabet onto the standard one a2b_base64 reads
+_URLSAFE_TO_STD = str.maketrans('-_', '+/')
+
+# Partial-response mask that keeps only what's needed to locate attachments.
+# Fields can't be selected recursively, so the mask is nested a few levels
+# deep and anything below that comes back whole.
+_PART_FIELDS = "filename,mimeType,body(attachmentId,size),parts"
+for _ in range(3):
+    _PART_FIELDS = f"filename,mimeType,body(attachmentId,size),parts({_PART_FIELDS})"
+MESSAGE_FIELDS = f"payload({_PART_FIELDS})"
+
+# Downloads are served by the agent's own Starlette app, which mounts the
+# downloads folder at DOWNLOAD_ROUTE and reports its address at startup
+DOWNLOAD_ROUTE = "/downloads"
+DOWNLOAD_PATH = os.path.join(os.getcwd(), "downloads")
+os.makedirs(DOWNLOAD_PATH, exist_ok=True)
+_download_base_url = f"http://localhost:10002{DOWNLOAD_ROUTE}"
+
+def _write_attachment(download_path: str, attachment: dict, attachment_data: dict) -> int:
+    """Decodes one fetched attachment, writes it under its chosen filename and returns its size."""
+    data = attachment_data['data']
+    file_size = 0
+    with open(os.path.join(download_path, attachment['saved_filename']), 'wb') as f:
+        # Decode slice by slice so a large file is never held fully decoded in memory
+        for start in range(0, len(data), DECODE_CHUNK_SIZE):
+            encoded = data[start:start + DECODE_CHUNK_SIZE].translate(_URLSAFE_TO_STD)
+            chunk = a2b_base64(encoded + '=' * (-len(encoded) % 4))
+            f.write(chunk)
+            file_size += len(chunk)
+    return file_size
+
+def set_download_host(host: str, port: int):
+    """Points download links at the agent server that mounts DOWNLOAD_ROUTE."""
+    global _download_base_url
+    _download_base_url = f"http://{host}:{port}{DOWNLOAD_ROUTE}"
 
 def download_email_attachments(email_id: str) -> dict:
     """
     Downloads all attachments from an email and returns localhost download links.
-    Automatically starts a file server if not already running.
+    The files are served by the Gmail agent's own server.
     
     Args:
         email_id (str): The Gmail message ID
@@ -109,96 +59,117 @@ def download_email_attachments(email_id: str) -> dict:
     Returns:
         dict: Contains download links and file information
     """
-    creds = _get_credentials()
-    service = build("gmail", "v1", credentials=creds)
+    service = get_service()
     
     try:
-        # Create downloads directory
-        download_path = os.path.join(os.getcwd(), "downloads")
-        os.makedirs(download_path, exist_ok=True)
-
-        # Start file server automatically
-        server_info = _start_file_server(download_path)
-        server = server_info["server"]
-        server_port = server_info["port"]
+        download_path = DOWNLOAD_PATH
 
         # Get the email message
-        msg = service.users().messages().get(userId='me', id=email_id).execute()
+        # get_email_details usually ran first and its message covers these fields
+        msg = get_cached_message(email_id)
+        if msg is None:
+            msg = service.users().messages().get(
+                userId='me', id=email_id, format='full', fields=MESSAGE_FIELDS
+            ).execute(num_retries=NUM_RETRIES)
         
         # Extract attachments
         attachments = []
-        def extract_attachments_recursive(payload):
+        # Walk the MIME tree depth-first with an explicit stack; children are
+        # pushed in reverse so attachments keep their order in the message
+        stack = [msg['payload']]
+        while stack:
+            part = stack.pop()
             # Check if this part is an attachment (at any level)
-            if payload.get('filename') and payload['body'].get('attachmentId'):
+            filename = part.get('filename')
+            body = part.get('body') or {}
+            attachment_id = body.get('attachmentId')
+            if filename and attachment_id:
                 attachments.append({
-                    'attachment_id': payload['body']['attachmentId'],
-                    'filename': payload['filename'],
-                    'mime_type': payload['mimeType'],
-                    'size': payload['body'].get('size', 0)
+                    'attachment_id': attachment_id,
+                    'filename': filename,
+                    'mime_type': part['mimeType'],
+                    'size': body.get('size', 0)
                 })
-
-            # Then recurse into sub-parts if they exist
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    extract_attachments_recursive(part)
-
-        extract_attachments_recursive(msg['payload'])
+            stack.extend(reversed(part.get('parts', ())))
         
         if not attachments:
             return {
                 "status": "No attachments found in this email.",
-                "file_server_running": server is not None,
-                "server_info": f"File server running at http://localhost:{server_port}" if server else "File server not running"
+                "file_server_running": True,
+                "server_info": f"Files are served at {_download_base_url}"
             }
-        
+
         downloaded_files = []
         failed_downloads = []
         
-        # Download each attachment
+        # Pick unique filenames up front so the batch callbacks only decode and write.
+        # One directory listing replaces a stat() per candidate name.
+        taken = set(os.listdir(download_path))
         for attachment in attachments:
+            filename = attachment['filename']
+            name, ext = os.path.splitext(filename)
+            counter = 1
+            while filename in taken:
+                filename = f"{name}_{counter}{ext}"
+                counter += 1
+            taken.add(filename)
+            attachment['saved_filename'] = filename
+
+        # Decoding and writing run on a small thread pool while the batch
+        # callbacks keep handing over responses
+        pending = []
+        with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+            def on_attachment(attachment):
+                def callback(request_id, attachment_data, exception):
+                    if exception is not None:
+                        failed_downloads.append({
+                            "filename": attachment['filename'],
+                            "error": str(exception)
+                        })
+                        return
+                    pending.append((
+                        attachment,
+                        executor.submit(_write_attachment, download_path, attachment, attachment_data)
+                    ))
+                return callback
+
+            # Fetch the attachments in batched requests instead of one round trip each
+            attachments_api = service.users().messages().attachments()
+            for start in range(0, len(attachments), MAX_BATCH_SIZE):
+                batch = service.new_batch_http_request()
+                for attachment in attachments[start:start + MAX_BATCH_SIZE]:
+                    batch.add(
+                        attachments_api.get(
+                            userId='me',
+                            messageId=email_id,
+                            id=attachment['attachment_id']
+                        ),
+                        callback=on_attachment(attachment)
+                    )
+                batch.execute()
+
+        for attachment, future in pending:
             try:
-                # Get the attachment data
-                attachment_data = service.users().messages().attachments().get(
-                    userId='me', 
-                    messageId=email_id, 
-                    id=attachment['attachment_id']
-                ).execute()
-                
-                # Decode the attachment data
-                file_data = base64.urlsafe_b64decode(attachment_data['data'])
-                
-                # Create unique filename if file exists
-                filename = attachment['filename']
-                file_path = os.path.join(download_path, filename)
-                counter = 1
-                original_filename = filename
-                while os.path.exists(file_path):
-                    name, ext = os.path.splitext(original_filename)
-                    filename = f"{name}_{counter}{ext}"
-                    file_path = os.path.join(download_path, filename)
-                    counter += 1
-                
-                # Write the file
-                with open(file_path, 'wb') as f:
-                    f.write(file_data)
-
-                # Create download link using the actual server port with URL encoding for spaces
-                download_link = f"http://localhost:{server_port}/{quote(filename)}"
-                
-                downloaded_files.append({
-                    "filename": filename,
-                    "original_filename": attachment['filename'],
-                    "download_link": download_link,
-                    "file_size": len(file_data),
-                    "mime_type": attachment['mime_type']
-                })
-                
+                file_size = future.result()
             except Exception as e:
                 failed_downloads.append({
                     "filename": attachment['filename'],
                     "error": str(e)
                 })
-        
+                continue
+
+            # Create download link under the agent server's downloads mount with URL encoding for spaces
+            filename = attachment['saved_filename']
+            download_link = f"{_download_base_url}/{quote(filename)}"
+
+            downloaded_files.append({
+                "filename": filename,
+                "original_filename": attachment['filename'],
+                "download_link": download_link,
+                "file_size": file_size,
+                "mime_type": attachment['mime_type']
+            })
+
         result = {
             "email_id": email_id,
             "total_attachments": len(attachments),
@@ -206,8 +177,8 @@ def download_email_attachments(email_id: str) -> dict:
             "failed_downloads": len(failed_downloads),
             "download_links": downloaded_files,
             "failed_files": failed_downloads,
-            "file_server_running": server is not None,
-            "server_info": f"File server running at http://localhost:{server_port}" if server else "File server not running"
+            "file_server_running": True,
+            "server_info": f"Files are served at {_download_base_url}"
         }
 
         return result
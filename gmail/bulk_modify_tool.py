@@ -0,0 +1,62 @@
+import asyncio
+from typing import List
+from googleapiclient.errors import HttpError
+from _auth import NUM_RETRIES, get_service
+from email_details_tool import forget_cached_messages
+
+# batchModify accepts at most 1000 message IDs per call
+MAX_BULK_IDS = 1000
+
+
+def _chunks(ids):
+    return [ids[start:start + MAX_BULK_IDS] for start in range(0, len(ids), MAX_BULK_IDS)]
+
+
+async def bulk_trash_emails(ids: List[str]) -> dict:
+    """
+    Moves several emails to the trash at once. Trashed emails can still be
+    restored from the Trash label in Gmail.
+
+    Args:
+        ids (List[str]): Gmail message IDs to move to the trash.
+
+    Returns:
+        dict: Status of the operation and the number of emails trashed.
+    """
+    result = await asyncio.to_thread(_bulk_trash_emails, ids)
+    if result["status"] == "success":
+        # Back on the event loop thread, which owns the message cache
+        forget_cached_messages(ids)
+    return result
+
+
+def _bulk_trash_emails(ids):
+    if not ids:
+        return {"status": "error", "message": "No email IDs given."}
+    try:
+        messages = get_service().users().messages()
+        for chunk in _chunks(ids):
+            # One call per 1000 messages instead of one trash call each
+            messages.batchModify(
+                userId='me',
+                body={'ids': chunk, 'addLabelIds': ['TRASH'], 'removeLabelIds': ['INBOX']}
+            ).execute(num_retries=NUM_RETRIES)
+
+        return {
+            "status": "success",
+            "message": "Emails moved to trash",
+            "count": len(ids)
+        }
+
+    except HttpError as error:
+        return {
+            "status": "error",
+            "message": f"An error occurred: {error}",
+            "details": str(error)
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to trash emails: {str(e)}"
+        }
+
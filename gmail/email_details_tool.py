@@ -1,48 +1,47 @@
-import os
-import base64
 import re
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+try:
+    import pybase64 as base64  # SIMD-accelerated, same API as the stdlib
+except ImportError:
+    import base64
+from cachetools import TTLCache
 from googleapiclient.errors import HttpError
-from bs4 import BeautifulSoup
-
-# Using a more permissive scope to allow for searching and other actions
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials."""
-    creds = None
-    if os.path.exists("token.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+from _auth import NUM_RETRIES, get_service
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # Fall back to the pure-Python parser, imported on first use
+    HTMLParser = None
+
+# Only the message fields get_email_details reads below
+MESSAGE_FIELDS = "id,threadId,labelIds,snippet,sizeEstimate,payload(headers,parts,body,mimeType,filename)"
+
+# Headers get_email_details reports
+WANTED_HEADERS = frozenset(('subject', 'from', 'to', 'cc', 'bcc', 'date', 'message-id'))
+
+# Recently fetched messages keyed by ID, so a download_email_attachments call
+# that follows get_email_details reuses the message instead of fetching it again
+_message_cache = TTLCache(maxsize=64, ttl=300)
+
+def get_cached_message(email_id: str):
+    """Returns the message get_email_details fetched recently, if any."""
+    return _message_cache.get(email_id)
+
+def forget_cached_messages(email_ids):
+    """Drops messages that were trashed or no longer exist."""
+    for email_id in email_ids:
+        _message_cache.pop(email_id, None)
+
+_BLANK_RE = re.compile(r'\n\s*\n+')
+
+def html_to_text(html: str) -> str:
+    """Converts an HTML body to plain text, collapsing runs of blank lines."""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        node = tree.body or tree.root
+        text = node.text() if node is not None else ''
+    else:
+        from bs4 import BeautifulSoup
+        text = BeautifulSoup(html, "html.parser").get_text()
+    return _BLANK_RE.sub('\n\n', text).strip()
 
 def get_email_details(email_id: str) -> dict:
     """
@@ -54,76 +53,79 @@ def get_email_details(email_id: str) -> dict:
     Returns:
         dict: Contains complete email details including headers, body, labels, and attachments info
     """
-    creds = _get_credentials()
-    service = build("gmail", "v1", credentials=creds)
+    service = get_service()
 
     try:
         # Get the email message with full format
-        msg = service.users().messages().get(userId='me', id=email_id, format='full').execute()
+        msg = _message_cache.get(email_id)
+        if msg is None:
+            msg = service.users().messages().get(userId='me', id=email_id, format='full', fields=MESSAGE_FIELDS).execute(num_retries=NUM_RETRIES)
+            labels = msg.get('labelIds', [])
+            # Labels change (read, trashed, relabelled) while the content
+            # doesn't, so the cached copy leaves them out
+            _message_cache[email_id] = {key: value for key, value in msg.items() if key != 'labelIds'}
+        else:
+            labels = service.users().messages().get(
+                userId='me', id=email_id, format='minimal', fields='labelIds'
+            ).execute(num_retries=NUM_RETRIES).get('labelIds', [])
 
         payload = msg['payload']
         headers = payload.get('headers', [])
 
+        # Collect the wanted headers in one pass (first occurrence wins),
+        # stopping as soon as all of them have been seen
+        header_map = {}
+        for h in headers:
+            key = h['name'].lower()
+            if key in WANTED_HEADERS and key not in header_map:
+                header_map[key] = h['value']
+                if len(header_map) == len(WANTED_HEADERS):
+                    break
+
         # Extract all important headers
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '(No Subject)')
-        from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), '(Unknown Sender)')
-        to_email = next((h['value'] for h in headers if h['name'].lower() == 'to'), '(Unknown Recipient)')
-        cc_email = next((h['value'] for h in headers if h['name'].lower() == 'cc'), None)
-        bcc_email = next((h['value'] for h in headers if h['name'].lower() == 'bcc'), None)
-        date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '(Unknown Date)')
-        message_id = next((h['value'] for h in headers if h['name'].lower() == 'message-id'), None)
-
-        # Extract email body
-        email_body_plain = ""
+        subject = header_map.get('subject', '(No Subject)')
+        from_email = header_map.get('from', '(Unknown Sender)')
+        to_email = header_map.get('to', '(Unknown Recipient)')
+        cc_email = header_map.get('cc')
+        bcc_email = header_map.get('bcc')
+        date = header_map.get('date', '(Unknown Date)')
+        message_id = header_map.get('message-id')
+
+        # Walk the MIME tree once, depth-first, collecting attachments and the
+        # first text/plain and text/html bodies. Bodies are only decoded
+        # afterwards, and HTML only when there is no plain text version.
         email_body_html = ""
-
-        def extract_body_recursive(payload):
-            """Recursively extract body from email parts."""
-            nonlocal email_body_plain, email_body_html
-
-            # Check if this part has a body
-            if 'mimeType' in payload:
-                if payload['mimeType'] == 'text/plain' and 'data' in payload.get('body', {}):
-                    email_body_plain = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
-                elif payload['mimeType'] == 'text/html' and 'data' in payload.get('body', {}):
-                    email_body_html = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
-
-            # Recurse into parts if they exist
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    extract_body_recursive(part)
-
-        # Extract body from payload
-        extract_body_recursive(payload)
-
-        # If we have HTML, convert it to readable text
-        body_text = ""
-        if email_body_html:
-            soup = BeautifulSoup(email_body_html, "html.parser")
-            text = soup.get_text()
-            body_text = re.sub(r'\n\s*\n+', '\n\n', text).strip()
-        elif email_body_plain:
-            body_text = email_body_plain
-
-        # Extract attachment information
+        plain_data = None
+        html_data = None
         attachments = []
-        def extract_attachments_recursive(payload):
-            if payload.get('filename') and payload.get('body', {}).get('attachmentId'):
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            mime_type = part.get('mimeType')
+            filename = part.get('filename')
+            body = part.get('body') or {}
+            attachment_id = body.get('attachmentId')
+            if filename and attachment_id:
                 attachments.append({
-                    'filename': payload['filename'],
-                    'mime_type': payload.get('mimeType', 'unknown'),
-                    'size': payload.get('body', {}).get('size', 0),
-                    'attachment_id': payload['body']['attachmentId']
+                    'filename': filename,
+                    'mime_type': mime_type or 'unknown',
+                    'size': body.get('size', 0),
+                    'attachment_id': attachment_id
                 })
-
-            if 'parts' in payload:
-                for part in payload['parts']:
-                    extract_attachments_recursive(part)
-
-        extract_attachments_recursive(payload)
-
-        # Get labels
-        labels = msg.get('labelIds', [])
+            elif 'data' in body:
+                if mime_type == 'text/plain' and plain_data is None:
+                    plain_data = body['data']
+                elif mime_type == 'text/html' and html_data is None:
+                    html_data = body['data']
+            stack.extend(reversed(part.get('parts', ())))
+
+        # Prefer the plain text body, otherwise convert the HTML to readable text
+        body_text = ""
+        if plain_data is not None:
+            body_text = base64.urlsafe_b64decode(plain_data).decode('utf-8')
+        elif html_data is not None:
+            email_body_html = base64.urlsafe_b64decode(html_data).decode('utf-8')
+            body_text = html_to_text(email_body_html)
 
         # Get thread ID
         thread_id = msg.get('threadId', None)
@@ -153,7 +155,7 @@ def get_email_details(email_id: str) -> dict:
         if message_id:
             email_details["message_id"] = message_id
 
-        # Add raw HTML body if needed
+        # Add raw HTML body if it was the one used
         if email_body_html:
             email_details["body_html"] = email_body_html
 
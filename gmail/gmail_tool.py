@@ -1,50 +1,20 @@
-import os
-import base64
-import re
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from bs4 import BeautifulSoup
-
-# Using a more permissive scope to allow for searching and other actions
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials."""
-    creds = None
-    if os.path.exists("token.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
-
-def get_latest_emails(n: int = 1) -> dict:
+import asyncio
+try:
+    import pybase64 as base64  # SIMD-accelerated, same API as the stdlib
+except ImportError:
+    import base64
+from _auth import get_messages, get_service
+from email_details_tool import html_to_text
+
+# Only the parts of each message get_latest_emails reads
+MESSAGE_FIELDS = 'id,payload(headers(name,value),body/data,parts(mimeType,body/data))'
+
+def _decode_body(data):
+    # A malformed body shouldn't fail the whole batch of emails
+    return base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
+
+
+async def get_latest_emails(n: int = 1) -> dict:
     """
     Fetches the most recent n emails from the inbox, including their date, sender,
     recipient, subject, and body.
@@ -55,46 +25,61 @@ def get_latest_emails(n: int = 1) -> dict:
     Returns:
         dict: Contains either a list of emails or an error status.
     """
-    creds = _get_credentials()
-    service = build("gmail", "v1", credentials=creds)
+    return await asyncio.to_thread(_get_latest_emails, n)
+
 
-    results = service.users().messages().list(userId='me', labelIds=['INBOX'], maxResults=n).execute()
+def _get_latest_emails(n):
+    service = get_service()
+
+    results = service.users().messages().list(
+        userId='me', labelIds=['INBOX'], maxResults=n, fields='messages/id'
+    ).execute()
     messages = results.get('messages', [])
     if not messages:
         return {"status": "No emails found."}
 
+    # Fetch every message in one batched round trip instead of one get each
+    full_messages = get_messages(
+        service, [message['id'] for message in messages], format='full', fields=MESSAGE_FIELDS
+    )
+
     emails = []
-    for message in messages:
+    for message, msg in zip(messages, full_messages):
         msg_id = message['id']
-        msg = service.users().messages().get(userId='me', id=msg_id, format='full').execute()
 
         payload = msg['payload']
-        headers = payload['headers']
-        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '(No Subject)')
-        from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), '(Unknown Sender)')
-        to_email = next((h['value'] for h in headers if h['name'].lower() == 'to'), '(Unknown Recipient)')
-        date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '(Unknown Date)')
+        headers = payload.get('headers', [])
+        # One pass over the headers; filling from the end keeps the first occurrence
+        header_map = {h['name'].lower(): h['value'] for h in reversed(headers)}
+        subject = header_map.get('subject', '(No Subject)')
+        from_email = header_map.get('from', '(Unknown Sender)')
+        to_email = header_map.get('to', '(Unknown Recipient)')
+        date = header_map.get('date', '(Unknown Date)')
 
         email_body = ""
         if 'parts' in payload:
             parts = payload['parts']
-            plain_text_body = None
-            html_body = None
+            # Only note where each alternative's data is; the one used is
+            # decoded once after the walk
+            plain_data = None
+            html_data = None
             for part in parts:
-                if part['mimeType'] == 'text/plain' and 'data' in part['body']:
-                    plain_text_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                elif part['mimeType'] == 'text/html' and 'data' in part['body']:
-                    html_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-            
-            if html_body:
-                soup = BeautifulSoup(html_body, "html.parser")
-                text = soup.get_text()
-                email_body = re.sub(r'\n\s*\n+', '\n\n', text).strip()
-            elif plain_text_body:
-                email_body = plain_text_body
-
-        elif 'data' in payload['body']:
-            email_body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
+                # The fields mask drops 'body' from parts that carry no data
+                body = part.get('body') or {}
+                if part['mimeType'] == 'text/plain' and 'data' in body:
+                    plain_data = body['data']
+                elif part['mimeType'] == 'text/html' and 'data' in body:
+                    html_data = body['data']
+
+            # Prefer the plain text alternative, so HTML is only parsed for
+            # messages that don't have one
+            if plain_data:
+                email_body = _decode_body(plain_data)
+            elif html_data:
+                email_body = html_to_text(_decode_body(html_data))
+
+        elif 'data' in payload.get('body', {}):
+            email_body = _decode_body(payload['body']['data'])
 
         emails.append({
             "id": msg_id,
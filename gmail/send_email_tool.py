@@ -1,51 +1,11 @@
-import os
-import base64
+try:
+    import pybase64 as base64  # SIMD-accelerated, same API as the stdlib
+except ImportError:
+    import base64
 from typing import Optional
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from email.message import EmailMessage
 from googleapiclient.errors import HttpError
-
-# Using gmail.modify scope to allow sending emails
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials."""
-    creds = None
-    if os.path.exists("token.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+from _auth import get_service
 
 def send_email(to: str, subject: str, body: str, cc: Optional[str] = None, bcc: Optional[str] = None) -> dict:
     """
@@ -69,11 +29,11 @@ def send_email(to: str, subject: str, body: str, cc: Optional[str] = None, bcc:
         )
     """
     try:
-        creds = _get_credentials()
-        service = build("gmail", "v1", credentials=creds)
+        service = get_service()
 
-        # Create the email message
-        message = MIMEMultipart()
+        # Create the email message. The body is its only part, so a single
+        # text/plain message replaces the one-part multipart container.
+        message = EmailMessage()
         message['To'] = to
         message['Subject'] = subject
 
@@ -82,11 +42,10 @@ def send_email(to: str, subject: str, body: str, cc: Optional[str] = None, bcc:
         if bcc:
             message['Bcc'] = bcc
 
-        # Attach the body as plain text
-        message.attach(MIMEText(body, 'plain'))
+        message.set_content(body)
 
         # Encode the message
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        raw_message = base64.urlsafe_b64encode(bytes(message)).decode('ascii')
 
         # Send the message
         send_result = service.users().messages().send(
@@ -0,0 +1,152 @@
+import functools
+import logging
+import os
+import threading
+import httplib2
+import orjson
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.model import JsonModel
+
+logger = logging.getLogger(__name__)
+
+# Tasks API scope for full access
+SCOPES = ["https://www.googleapis.com/auth/tasks"]
+FIXED_PORT = 8080
+TOKEN_PATH = "token_tasks.json"
+
+# Retries (with exponential backoff) for transient 429/5xx API responses
+NUM_RETRIES = 3
+
+# Calls packed into each Tasks batch request
+MAX_BATCH_SIZE = 100
+
+# Process-lifetime cache shared by the Tasks tools. The token file is only
+# read once and the credentials are only rebuilt when they stop being valid.
+# _LOCK serializes every load, refresh and consent flow in this process, so
+# concurrent tool calls with an expired token trigger just one of them.
+_CREDS = None
+_LOCK = threading.Lock()
+
+
+def _load_credentials(creds):
+    """Loads, refreshes or re-authorizes credentials and persists the token."""
+    if creds is None:
+        try:
+            creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Error loading %s: %s. Will re-authenticate.", TOKEN_PATH, e)
+            creds = None
+    if not creds or not creds.valid:
+        # Only write the token back if a refresh changed it or it is new
+        needs_save = False
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                old_token = creds.token
+                creds.refresh(Request())
+                needs_save = creds.token != old_token
+            except Exception as e:
+                # Refresh failed, need full re-auth
+                logger.warning("Token refresh failed: %s", e)
+                creds = None
+
+        if not creds:  # Either no token or refresh failed
+            # Only needed for the one-time consent flow, so not imported up front
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(
+                "credentials.json", SCOPES
+            )
+            creds = flow.run_local_server(
+                port=FIXED_PORT,
+                access_type='offline',
+                prompt='consent'
+            )
+            needs_save = True
+
+        if needs_save:
+            # Swap in a complete file, so another agent process never reads a
+            # half-written token while this one is saving it
+            tmp_path = f"{TOKEN_PATH}.tmp"
+            with open(tmp_path, "w") as token:
+                token.write(creds.to_json())
+            os.replace(tmp_path, TOKEN_PATH)
+    return creds
+
+
+def get_credentials():
+    """Returns cached Tasks API credentials, refreshing them only when invalid."""
+    global _CREDS
+    creds = _CREDS
+    if creds and creds.valid:
+        return creds
+    with _LOCK:
+        # Another caller may have refreshed while we waited for the lock.
+        if not (_CREDS and _CREDS.valid):
+            _CREDS = _load_credentials(_CREDS)
+        return _CREDS
+
+
+@functools.lru_cache(maxsize=4)
+def _authorized_http(creds):
+    # One authorized transport per credentials object rather than per API
+    # client, so every client built for these credentials shares its
+    # keep-alive connections.
+    return AuthorizedHttp(creds, http=httplib2.Http(timeout=30))
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson instead of stdlib json."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Keep googleapiclient's handling of non-JSON bodies
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(api, version):
+    # The discovery document bundled with googleapiclient, read from disk once
+    # per process however many times the client is rebuilt
+    return get_static_doc(api, version)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_service(api, version, creds):
+    # Keyed on the credentials object itself, so a re-authorized (new) object
+    # builds a fresh client while in-place refreshes keep reusing this one.
+    # Building from the bundled document means there is no discovery fetch.
+    return build_from_document(
+        _discovery_document(api, version),
+        http=_authorized_http(creds),
+        model=_OrjsonModel(),
+    )
+
+
+def get_service():
+    """Returns a cached Tasks API client bound to the current credentials."""
+    return _build_service("tasks", "v1", get_credentials())
+
+
+def execute_batch(service, requests):
+    """Runs API requests through batch requests, returning (response, error) pairs in order."""
+    results = [(None, None)] * len(requests)
+
+    def on_response(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for start in range(0, len(requests), MAX_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for index in range(start, min(start + MAX_BATCH_SIZE, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+    return results
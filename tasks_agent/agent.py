@@ -1,7 +1,7 @@
 from google.adk.agents import LlmAgent
-from list_tasks_tool import list_tasks
+from list_tasks_tool import batch_get_tasks, list_tasks, list_tasks_many
 from create_task_tool import create_task
-from update_task_tool import update_task
+from update_task_tool import batch_update_tasks, update_task
 from delete_task_tool import delete_task
 from complete_task_tool import complete_task
 from list_tasklists_tool import list_tasklists
@@ -9,10 +9,13 @@ from list_tasklists_tool import list_tasklists
 agent_instruction = """
 You are an assistant that can help manage a user's Google Tasks and to-do lists.
 
-You have six tools available:
+You have nine tools available:
 - `list_tasks`: Use this when the user wants to see their tasks or to-do items. You can show completed tasks if requested. By default, shows tasks from the default list.
+- `list_tasks_many`: Use this when the user wants tasks from several task lists, or from all of them, at once. Leave the list IDs out to cover every list. Prefer this over calling `list_tasks` once per list.
 - `create_task`: Use this when the user wants to add a new task or to-do item. You'll need the task title. You can optionally add notes, due date, or make it a subtask of another task.
 - `update_task`: Use this when the user wants to modify an existing task. You'll need the task ID and can update the title, notes, due date, or status.
+- `batch_update_tasks`: Use this instead of calling `update_task` repeatedly when several tasks need changes, such as marking many tasks completed. Pass one update per task, each with its task ID and the fields to change.
+- `batch_get_tasks`: Use this when you need the details of several specific tasks by ID from the same list.
 - `complete_task`: Use this when the user wants to mark a task as done or completed. You'll need the task ID.
 - `delete_task`: Use this when the user wants to remove a task permanently. You'll need the task ID.
 - `list_tasklists`: Use this when the user wants to see all their task lists or switch between different lists.
@@ -32,12 +35,15 @@ def create_agent() -> LlmAgent:
     return LlmAgent(
     model="gemini-3.1-flash-lite",
     name="tasks_agent",
-    description="A helpful assistant for managing Google Tasks and to-do lists. It can list tasks, create new tasks with notes and due dates, update existing tasks, mark tasks as completed, delete tasks, and manage multiple task lists.",
+    description="A helpful assistant for managing Google Tasks and to-do lists. It can list tasks, create new tasks with notes and due dates, update existing tasks one at a time or in bulk, mark tasks as completed, delete tasks, and manage multiple task lists.",
     instruction=agent_instruction,
     tools=[
         list_tasks,
+        list_tasks_many,
         create_task,
         update_task,
+        batch_update_tasks,
+        batch_get_tasks,
         complete_task,
         delete_task,
         list_tasklists
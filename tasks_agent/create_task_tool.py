@@ -1,46 +1,7 @@
-import os
 from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-
-# Tasks API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/tasks"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Tasks API."""
-    creds = None
-    if os.path.exists("token_tasks.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_tasks.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_tasks.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_tasks.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+from _auth import get_service
+from list_tasklists_tool import invalidate_tasklists_cache
 
 def create_task(
     title: str,
@@ -79,8 +40,7 @@ def create_task(
         }
     """
     try:
-        creds = _get_credentials()
-        service = build("tasks", "v1", credentials=creds)
+        service = get_service()
 
         # Build task body
         task = {
@@ -100,6 +60,7 @@ def create_task(
             params['parent'] = parent
 
         created_task = service.tasks().insert(**params).execute()
+        invalidate_tasklists_cache()
 
         return {
             "status": "success",
@@ -1,45 +1,15 @@
-import os
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from cachetools import TTLCache
 from googleapiclient.errors import HttpError
+from _auth import NUM_RETRIES, get_service
 
-# Tasks API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/tasks"]
-FIXED_PORT = 8080
+# The last list_tasklists result, kept briefly since the model often lists
+# the task lists again within a few turns. Every successful task change
+# clears it, as that bumps the list's 'updated' time.
+_tasklists_cache = TTLCache(maxsize=1, ttl=30)
 
-def _get_credentials():
-    """Helper function to get user credentials for Tasks API."""
-    creds = None
-    if os.path.exists("token_tasks.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_tasks.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_tasks.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_tasks.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+def invalidate_tasklists_cache():
+    """Drops the cached task lists after a task has changed."""
+    _tasklists_cache.clear()
 
 def list_tasklists() -> dict:
     """
@@ -58,12 +28,23 @@ def list_tasklists() -> dict:
             ]
         }
     """
+    cached = _tasklists_cache.get('tasklists')
+    if cached is not None:
+        return cached
+
+    result = _list_tasklists()
+    if result.get("status") != "error":
+        _tasklists_cache['tasklists'] = result
+    return result
+
+def _list_tasklists():
     try:
-        creds = _get_credentials()
-        service = build("tasks", "v1", credentials=creds)
+        service = get_service()
 
         # Fetch all task lists
-        results = service.tasklists().list().execute()
+        results = service.tasklists().list(
+            fields='items(id,title,updated)'
+        ).execute(num_retries=NUM_RETRIES)
         tasklists = results.get('items', [])
 
         if not tasklists:
@@ -1,46 +1,38 @@
-import os
-from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import List, Optional
 from googleapiclient.errors import HttpError
-
-# Tasks API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/tasks"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Tasks API."""
-    creds = None
-    if os.path.exists("token_tasks.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_tasks.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_tasks.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
-
-        with open("token_tasks.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+from _auth import NUM_RETRIES, execute_batch, get_service
+
+# Only the task fields format_task reads
+TASK_FIELDS = "id,title,status,updated,position,notes,due,completed,parent,links"
+LIST_FIELDS = f"items({TASK_FIELDS}),nextPageToken"
+
+# The Tasks API returns at most 100 tasks per page
+PAGE_SIZE = 100
+
+# Fields format_task always reports (with their defaults) and those it only
+# copies when the task has them
+_DEFAULTED = (("title", "(No Title)"), ("status", "needsAction"), ("updated", ""), ("position", ""))
+_OPTIONAL = ("notes", "due", "completed", "parent", "links")
+
+def format_task(task):
+    """Picks the fields the Tasks tools report from an API task resource."""
+    return {
+        "id": task['id'],
+        **{key: task.get(key, default) for key, default in _DEFAULTED},
+        **{key: task[key] for key in _OPTIONAL if key in task},
+    }
+
+def _list_params(tasklist_id, max_results, show_completed):
+    params = {
+        'tasklist': tasklist_id,
+        'maxResults': min(max_results, PAGE_SIZE),
+        'fields': LIST_FIELDS
+    }
+
+    if show_completed:
+        params['showCompleted'] = True
+        params['showHidden'] = True
+    return params
 
 def list_tasks(tasklist_id: str = "@default", max_results: int = 100, show_completed: bool = False) -> dict:
     """
@@ -49,6 +41,7 @@ def list_tasks(tasklist_id: str = "@default", max_results: int = 100, show_compl
     Args:
         tasklist_id (str): Task list ID to fetch tasks from. Defaults to "@default" (primary list).
         max_results (int): Maximum number of tasks to return. Defaults to 100.
+            Larger values are fetched page by page.
         show_completed (bool): Whether to include completed tasks. Defaults to False.
 
     Returns:
@@ -73,21 +66,18 @@ def list_tasks(tasklist_id: str = "@default", max_results: int = 100, show_compl
         }
     """
     try:
-        creds = _get_credentials()
-        service = build("tasks", "v1", credentials=creds)
+        service = get_service()
 
         # Fetch tasks
-        params = {
-            'tasklist': tasklist_id,
-            'maxResults': max_results
-        }
-
-        if show_completed:
-            params['showCompleted'] = True
-            params['showHidden'] = True
-
-        results = service.tasks().list(**params).execute()
-        tasks = results.get('items', [])
+        params = _list_params(tasklist_id, max_results, show_completed)
+        # Follow nextPageToken until max_results tasks have been collected
+        tasks = []
+        request = service.tasks().list(**params)
+        while request is not None and len(tasks) < max_results:
+            results = request.execute(num_retries=NUM_RETRIES)
+            tasks.extend(results.get('items', []))
+            request = service.tasks().list_next(request, results)
+        del tasks[max_results:]
 
         if not tasks:
             return {
@@ -97,34 +87,149 @@ def list_tasks(tasklist_id: str = "@default", max_results: int = 100, show_compl
                 "message": "No tasks found in this list."
             }
 
-        formatted_tasks = []
-        for task in tasks:
-            formatted_task = {
-                "id": task['id'],
-                "title": task.get('title', '(No Title)'),
-                "status": task.get('status', 'needsAction'),
-                "updated": task.get('updated', ''),
-                "position": task.get('position', '')
-            }
+        formatted_tasks = [format_task(task) for task in tasks]
 
-            # Add optional fields if present
-            if 'notes' in task:
-                formatted_task['notes'] = task['notes']
-            if 'due' in task:
-                formatted_task['due'] = task['due']
-            if 'completed' in task:
-                formatted_task['completed'] = task['completed']
-            if 'parent' in task:
-                formatted_task['parent'] = task['parent']
-            if 'links' in task:
-                formatted_task['links'] = task['links']
+        return {
+            "count": len(formatted_tasks),
+            "tasklist_id": tasklist_id,
+            "tasks": formatted_tasks
+        }
 
-            formatted_tasks.append(formatted_task)
+    except HttpError as error:
+        return {
+            "status": "error",
+            "message": f"An HTTP error occurred: {error}",
+            "tasklist_id": tasklist_id,
+            "tasks": []
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"An error occurred: {str(e)}",
+            "tasklist_id": tasklist_id,
+            "tasks": []
+        }
+
+def list_tasks_many(
+    tasklist_ids: Optional[List[str]] = None,
+    max_results: int = 100,
+    show_completed: bool = False
+) -> dict:
+    """
+    Lists tasks from several task lists at once.
+
+    Args:
+        tasklist_ids (List[str], optional): Task list IDs to fetch tasks from.
+            Defaults to every task list the user has.
+        max_results (int): Maximum number of tasks to return per list, up to 100.
+            Defaults to 100.
+        show_completed (bool): Whether to include completed tasks. Defaults to False.
+
+    Returns:
+        dict: One list_tasks-style entry per task list, in the order given.
+        {
+            "count": int,  # Total tasks across all lists
+            "tasklists": [
+                {
+                    "tasklist_id": str,
+                    "count": int,
+                    "tasks": list  # Same fields as list_tasks
+                }
+            ]
+        }
+    """
+    try:
+        service = get_service()
+
+        if tasklist_ids is None:
+            tasklist_ids = []
+            request = service.tasklists().list(maxResults=PAGE_SIZE, fields='items/id,nextPageToken')
+            while request is not None:
+                results = request.execute(num_retries=NUM_RETRIES)
+                tasklist_ids.extend(tasklist['id'] for tasklist in results.get('items', []))
+                request = service.tasklists().list_next(request, results)
+
+        # Every list's tasks come back together in one batched round trip
+        # instead of one list call per task list
+        requests = [
+            service.tasks().list(**_list_params(tasklist_id, max_results, show_completed))
+            for tasklist_id in tasklist_ids
+        ]
+        tasklists = []
+        for tasklist_id, (results, error) in zip(tasklist_ids, execute_batch(service, requests)):
+            if error is not None:
+                tasklists.append({
+                    "status": "error",
+                    "message": f"An HTTP error occurred: {error}",
+                    "tasklist_id": tasklist_id,
+                    "count": 0,
+                    "tasks": []
+                })
+                continue
+            formatted_tasks = [format_task(task) for task in results.get('items', [])]
+            tasklists.append({
+                "tasklist_id": tasklist_id,
+                "count": len(formatted_tasks),
+                "tasks": formatted_tasks
+            })
+
+        return {
+            "count": sum(tasklist["count"] for tasklist in tasklists),
+            "tasklists": tasklists
+        }
+
+    except HttpError as error:
+        return {
+            "status": "error",
+            "message": f"An HTTP error occurred: {error}",
+            "tasklists": []
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"An error occurred: {str(e)}",
+            "tasklists": []
+        }
+
+def batch_get_tasks(task_ids: List[str], tasklist_id: str = "@default") -> dict:
+    """
+    Fetches several tasks from one task list at once, in batch requests.
+
+    Args:
+        task_ids (List[str]): IDs of the tasks to fetch.
+        tasklist_id (str): Task list ID containing the tasks. Defaults to "@default".
+
+    Returns:
+        dict: The tasks that were found, in the order given, plus the IDs that failed.
+        {
+            "count": int,
+            "tasklist_id": str,
+            "tasks": list,  # Same fields as list_tasks
+            "errors": [{"task_id": str, "message": str}]
+        }
+    """
+    try:
+        service = get_service()
+
+        requests = [
+            service.tasks().get(tasklist=tasklist_id, task=task_id, fields=TASK_FIELDS)
+            for task_id in task_ids
+        ]
+        formatted_tasks = []
+        errors = []
+        for task_id, (task, error) in zip(task_ids, execute_batch(service, requests)):
+            if error is None:
+                formatted_tasks.append(format_task(task))
+            elif isinstance(error, HttpError) and error.resp.status == 404:
+                errors.append({"task_id": task_id, "message": "Task not found"})
+            else:
+                errors.append({"task_id": task_id, "message": str(error)})
 
         return {
             "count": len(formatted_tasks),
             "tasklist_id": tasklist_id,
-            "tasks": formatted_tasks
+            "tasks": formatted_tasks,
+            "errors": errors
         }
 
     except HttpError as error:
@@ -1,46 +1,52 @@
-import os
-from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import List, Optional
 from googleapiclient.errors import HttpError
+from _auth import execute_batch, get_service
+from list_tasklists_tool import invalidate_tasklists_cache
 
-# Tasks API scope for full access
-SCOPES = ["https://www.googleapis.com/auth/tasks"]
-FIXED_PORT = 8080
-
-def _get_credentials():
-    """Helper function to get user credentials for Tasks API."""
-    creds = None
-    if os.path.exists("token_tasks.json"):
-        try:
-            creds = Credentials.from_authorized_user_file("token_tasks.json", SCOPES)
-        except Exception as e:
-            print(f"Error loading token_tasks.json: {e}. Will re-authenticate.")
-            creds = None
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Refresh failed, need full re-auth
-                print(f"Token refresh failed: {e}")
-                creds = None
-
-        if not creds:  # Either no token or refresh failed
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(
-                port=FIXED_PORT,
-                access_type='offline',
-                prompt='consent'
-            )
+def build_patch_body(title=None, notes=None, due=None, status=None):
+    """Builds a partial task body holding only the fields that were provided."""
+    return {
+        key: value for key, value in (
+            ('title', title),
+            ('notes', notes),
+            ('due', due),
+            ('status', status),
+        ) if value is not None
+    }
+
+def _success_result(updated_task):
+    return {
+        "status": "success",
+        "message": "Task updated successfully",
+        "task_id": updated_task['id'],
+        "title": updated_task.get('title'),
+        "notes": updated_task.get('notes', 'No notes'),
+        "due": updated_task.get('due', 'No due date'),
+        "task_status": updated_task.get('status', 'needsAction')
+    }
+
+def _http_error_result(error, task_id):
+    if error.resp.status == 404:
+        return {
+            "status": "error",
+            "message": "Task not found",
+            "details": f"No task with ID '{task_id}' exists in the task list",
+            "task_id": task_id
+        }
+    else:
+        return {
+            "status": "error",
+            "message": "Failed to update task",
+            "details": str(error),
+            "task_id": task_id
+        }
 
-        with open("token_tasks.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+def _nothing_to_update(task_id):
+    return {
+        "status": "success",
+        "message": "No fields to update",
+        "task_id": task_id
+    }
 
 def update_task(
     task_id: str,
@@ -81,64 +87,27 @@ def update_task(
             "task_id": str
         }
     """
-    try:
-        creds = _get_credentials()
-        service = build("tasks", "v1", credentials=creds)
-
-        # First, retrieve the existing task
-        task = service.tasks().get(tasklist=tasklist_id, task=task_id).execute()
-
-        # Build update body with only writable fields
-        # We need to preserve existing values for fields not being updated
-        update_body = {
-            'id': task['id'],
-            'title': title if title is not None else task.get('title', ''),
-            'status': status if status is not None else task.get('status', 'needsAction')
-        }
-
-        # Add optional fields only if they exist or are being updated
-        if notes is not None:
-            update_body['notes'] = notes
-        elif 'notes' in task:
-            update_body['notes'] = task['notes']
+    body = build_patch_body(title, notes, due, status)
+    if not body:
+        # Nothing would change, so skip the round trip
+        return _nothing_to_update(task_id)
 
-        if due is not None:
-            update_body['due'] = due
-        elif 'due' in task:
-            update_body['due'] = task['due']
+    try:
+        service = get_service()
 
-        # Update the task
-        updated_task = service.tasks().update(
+        # Patch sends only the provided fields in a single request, with no
+        # prior get of the full task
+        updated_task = service.tasks().patch(
             tasklist=tasklist_id,
             task=task_id,
-            body=update_body
+            body=body
         ).execute()
+        invalidate_tasklists_cache()
 
-        return {
-            "status": "success",
-            "message": "Task updated successfully",
-            "task_id": updated_task['id'],
-            "title": updated_task.get('title'),
-            "notes": updated_task.get('notes', 'No notes'),
-            "due": updated_task.get('due', 'No due date'),
-            "task_status": updated_task.get('status', 'needsAction')
-        }
+        return _success_result(updated_task)
 
     except HttpError as error:
-        if error.resp.status == 404:
-            return {
-                "status": "error",
-                "message": "Task not found",
-                "details": f"No task with ID '{task_id}' exists in the task list",
-                "task_id": task_id
-            }
-        else:
-            return {
-                "status": "error",
-                "message": "Failed to update task",
-                "details": str(error),
-                "task_id": task_id
-            }
+        return _http_error_result(error, task_id)
     except Exception as e:
         return {
             "status": "error",
@@ -146,3 +115,89 @@ def update_task(
             "details": str(e),
             "task_id": task_id
         }
+
+def batch_update_tasks(updates: List[dict]) -> dict:
+    """
+    Updates several tasks at once, sending the changes together in batch requests.
+
+    Args:
+        updates (List[dict]): One dict per task to update. Each needs a "task_id"
+            and may have "title", "notes", "due", "status" and "tasklist_id"
+            (defaults to "@default"), with the same meaning as in update_task.
+
+    Returns:
+        dict: Counts of updated and failed tasks, plus one update_task-style
+        result per entry in "results", in the order given.
+        {
+            "status": "success" or "error",  # "error" if any update failed
+            "updated_count": int,
+            "failed_count": int,
+            "results": list
+        }
+    """
+    try:
+        service = get_service()
+
+        results = [None] * len(updates)
+        indexes = []
+        requests = []
+        for index, update in enumerate(updates):
+            task_id = update.get('task_id')
+            if not task_id:
+                results[index] = {
+                    "status": "error",
+                    "message": "Missing task ID",
+                    "details": "Each update needs a 'task_id'",
+                    "task_id": task_id
+                }
+                continue
+            body = build_patch_body(
+                update.get('title'), update.get('notes'), update.get('due'), update.get('status')
+            )
+            if not body:
+                results[index] = _nothing_to_update(task_id)
+                continue
+            indexes.append(index)
+            requests.append(service.tasks().patch(
+                tasklist=update.get('tasklist_id', '@default'),
+                task=task_id,
+                body=body
+            ))
+
+        # All the patches go out in one HTTP round trip per batch
+        responses = execute_batch(service, requests)
+        if requests:
+            invalidate_tasklists_cache()
+        for index, (updated_task, error) in zip(indexes, responses):
+            if error is None:
+                results[index] = _success_result(updated_task)
+            elif isinstance(error, HttpError):
+                results[index] = _http_error_result(error, updates[index]['task_id'])
+            else:
+                results[index] = {
+                    "status": "error",
+                    "message": "An unexpected error occurred",
+                    "details": str(error),
+                    "task_id": updates[index]['task_id']
+                }
+
+        failed_count = sum(1 for result in results if result["status"] == "error")
+        return {
+            "status": "error" if failed_count else "success",
+            "updated_count": len(results) - failed_count,
+            "failed_count": failed_count,
+            "results": results
+        }
+
+    except HttpError as error:
+        return {
+            "status": "error",
+            "message": "Failed to update tasks",
+            "details": str(error)
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": "An unexpected error occurred",
+            "details": str(e)
+        }